@@ -1,4 +1,159 @@
-from heapq import heappop, heappush
+import numpy as np
+from numba import njit
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+
+@njit(cache=True)
+def _heap_grow(heap, size):
+    """Copies the binary min heap held in heap[:size] into a buffer of twice the capacity.
+
+    :return: new heap buffer.
+    """
+    grown = np.empty(2 * heap.size, heap.dtype)
+    grown[:size] = heap[:size]
+    return grown
+
+
+@njit(cache=True)
+def _heap_push(heap, size, key):
+    """Pushes key onto the binary min heap held in heap[:size], which must have room for it.
+
+    :return: new size of heap.
+    """
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 1
+        if heap[parent] <= key:
+            break
+        heap[i] = heap[parent]
+        i = parent
+    heap[i] = key
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(heap, size):
+    """Pops smallest key off the binary min heap held in heap[:size].
+
+    :return: smallest key, new size of heap.
+    """
+    key = heap[0]
+    size -= 1
+    last = heap[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and heap[child + 1] < heap[child]:
+            child += 1
+        if heap[child] >= last:
+            break
+        heap[i] = heap[child]
+        i = child
+    heap[i] = last
+    return key, size
+
+
+@njit(cache=True)
+def _search_minturns(grid, sy, sx, ey, ex):
+    """Finds route through a packed grid in fewest number of turns, see MinTurns.search().
+
+    Search states are node id * 2 + axis, where axis is how we arrived at the node: 0 moving horizontally, 1
+    moving vertically. Heap entries are packed into one int64: estimated turns << 33 | state.
+
+    :param grid: uint8 array of the maze where 1 denotes a barrier, with a one cell border of barriers.
+    :param sy: row of start position.
+    :param sx: column of start position.
+    :param ey: row of end position.
+    :param ex: column of end position.
+    :return: fewest turns and length of that route, (-1, -1) if end position is never reached.
+    """
+    # (y, x) is at grid[y + 1, x + 1], so stepping off the maze lands on the border and needs no bounds check.
+    n = grid.shape[0] - 2
+    turn_count = np.full(2 * n * n, np.iinfo(np.int32).max, np.int32)
+    # Number of positions on the route to each state, counting the start position.
+    length_at = np.zeros(2 * n * n, np.int32)
+    visited = np.zeros(2 * n * n, np.bool_)
+    # The heap only holds the frontier, which is usually far smaller than the grid, and grows when needed.
+    heap = np.empty(4 * n, np.int64)
+    state_mask = (1 << 33) - 1
+
+    # Seed the start position in both axes so the first step is never a turn.
+    size = 0
+    start_id = sy * n + sx
+    end_id = ey * n + ex
+    for axis in range(2):
+        state = start_id * 2 + axis
+        turn_count[state] = 0
+        length_at[state] = 1
+        # Heading along the row (or column) of end_pos we may not need to turn again, otherwise we need one.
+        est = sy != ey if axis == 0 else sx != ex
+        size = _heap_push(heap, size, est << 33 | state)
+
+    while size:
+        # Routes with fewest estimated turns are up first in the priority queue.
+        key, size = _heap_pop(heap, size)
+        state = key & state_mask
+        # An improved route to state pushes a fresh entry, which leaves any older entries for state stale.
+        if visited[state]:
+            continue
+        visited[state] = True
+
+        node = state >> 1
+        # The heuristic is consistent, so the first time we reach end_pos it is by a route with fewest turns.
+        if node == end_id:
+            return turn_count[state], length_at[state]
+        axis = state & 1
+        y = node // n
+        x = node - y * n
+        # Moving along the axis we arrived on is straight ahead, anything else is a turn.
+        turns = turn_count[state]
+        length = length_at[state] + 1
+        turns_h = turns + axis
+        turns_v = turns + 1 - axis
+        est_h = turns_h + (y != ey)
+        est_v = turns_v + (x != ex)
+        # Make room for up to four pushes.
+        if size + 4 > heap.size:
+            heap = _heap_grow(heap, size)
+        # Only queue a neighbor when this route reaches it in fewer turns than any route so far. Expanded states
+        # already hold their fewest turns, so they are never queued again.
+        # Right.
+        if grid[y + 1, x + 2] == 0:
+            new_state = (node + 1) * 2
+            if turns_h < turn_count[new_state]:
+                turn_count[new_state] = turns_h
+                length_at[new_state] = length
+                size = _heap_push(heap, size, est_h << 33 | new_state)
+        # Up.
+        if grid[y, x + 1] == 0:
+            new_state = (node - n) * 2 + 1
+            if turns_v < turn_count[new_state]:
+                turn_count[new_state] = turns_v
+                length_at[new_state] = length
+                size = _heap_push(heap, size, est_v << 33 | new_state)
+        # Left.
+        if grid[y + 1, x] == 0:
+            new_state = (node - 1) * 2
+            if turns_h < turn_count[new_state]:
+                turn_count[new_state] = turns_h
+                length_at[new_state] = length
+                size = _heap_push(heap, size, est_h << 33 | new_state)
+        # Down.
+        if grid[y + 2, x + 1] == 0:
+            new_state = (node + n) * 2 + 1
+            if turns_v < turn_count[new_state]:
+                turn_count[new_state] = turns_v
+                length_at[new_state] = length
+                size = _heap_push(heap, size, est_v << 33 | new_state)
+
+    return -1, -1
+
+
+# Compile the kernel at import rather than during the first search.
+_search_minturns(np.pad(np.zeros((1, 1), np.uint8), 1, constant_values=1), 0, 0, 0, 0)
 
 
 class AStar(object):
@@ -24,149 +179,57 @@ class AStar(object):
         :param end_pos: Coordinates of end position.
         :param grid: List containing square grid of strings with 'x' denoting barriers.
         """
+        # Node ids and the compiled kernels assume n rows of n columns.
+        if not grid or any(len(row) != len(grid) for row in grid):
+            raise ValueError('grid must be a non-empty square: n strings each of length n.')
         self.start_pos = start_pos
         self.end_pos = end_pos
         self.grid = grid
+        # Packed copy of grid for the compiled kernels, 1 marks a barrier.
+        self.grid_np = (np.frombuffer(''.join(grid).encode(), dtype=np.uint8)
+                        .reshape(len(grid), len(grid[0])) == ord('x')).astype(np.uint8)
+        # Surrounding grid with barriers lets the compiled kernels skip bounds checks.
+        self._padded = np.pad(self.grid_np, 1, constant_values=1)
+        # Positions may also be identified by node id, y * self._size + x.
+        self._size = len(grid)
+
+    def _in_grid(self, pos: tuple) -> bool:
+        """Checks that pos lies within self.grid.
+
+        :param pos: Coordinates of a position.
+        :return: True if both coordinates of pos are between 0 and size of grid - 1.
+        """
+        return 0 <= pos[0] < self._size and 0 <= pos[1] < self._size
 
 
 class MinTurns(AStar):
 
     """A star algorithm for navigating a map in the fewest turns.
 
-    Given start and end points for a grid style maze, outputs a tuple containing; a list of coordinates, number of
-    turns, and length of route from start to end for the route with the fewest turns.
+    Given start and end points for a grid style maze, outputs a tuple containing; number of turns, and length of
+    route from start to end for the route with the fewest turns.
 
     """
 
-    def find_neighbors(self, curr_pos: tuple, prev_pos: tuple) -> list:
-        """Finds neighbors of curr_pos.
-
-        Adds coordinates of neighbors to list along with boolean(is_turn) representing whether a turn occurs to reach
-        the neighbor given path from prev_pos to curr_pos.
-
-        :param curr_pos: curr_pos of self.search().
-        :param prev_pos: position prior to curr_pos.
-        :return: list of tuples [((pos of neighbor), is_turn)].
-        """
-        limit = len(self.grid) - 1
-        neighbors = []
-        # Check each position adjacent to curr_pos.
-        for y, x in zip([0, -1, 0, 1], [1, 0, -1, 0]):
-            # If adjacent position is outside of grid, skip it.
-            if (curr_pos[0] + y) > limit or (curr_pos[0] + y) < 0 or (curr_pos[1] + x) > limit or (curr_pos[1] + x) < 0:
-                continue
-            # If adjacent position is a barrier, skip it.
-            if self.grid[curr_pos[0] + y][curr_pos[1] + x] == 'x':
-                continue
-            else:
-                # Ensure we do not count a first step as a turn.
-                if curr_pos == self.start_pos:
-                    is_turn = False
-                else:
-                    # Determine direction from prev_pos to curr_pos.
-                    if curr_pos != prev_pos[1] and curr_pos[0] == prev_pos[1][0]:
-                        direction = 'horizontal'
-                    else:
-                        direction = 'vertical'
-
-                    # Determine movement from curr_pos to new position.
-                    if y != 0:
-                        movement = 'vertical'
-                    else:
-                        movement = 'horizontal'
-
-                    # If we're not still moving in the same direction, we have turned.
-                    is_turn = not (movement == direction)
-                neighbors.append(((curr_pos[0] + y, curr_pos[1] + x), is_turn))
-        return neighbors
-
-    def make_path(self, curr_pos: tuple, route: dict) -> tuple:
-        """Creates list of coordinates representing turns in path.
-
-        :param curr_pos: end point of path.
-        :param route: dict of coordinates leading to curr_pos
-        :return: tuple containing list of coordinates of turns, len(list of coordinates)
-        """
-        turn_coords = []
-        x, path_length = 0, 1
-        prev_pos = curr_pos
-
-        if route.get(self.end_pos) is None:
-            return 'No path found.', []
-
-        while route[curr_pos] is not None:
-            curr_pos = route[curr_pos][1]
-
-            if curr_pos[x] != prev_pos[x]:
-                if x == 0:
-                    x = 1
-                else:
-                    x = 0
-
-                if prev_pos is not self.end_pos:
-                    turn_coords.append(prev_pos)
-
-            prev_pos = curr_pos
-            path_length += 1
-
-        turn_coords.reverse()
-        return len(turn_coords), path_length
-
     def search(self):
         """Finds path through self.grid in fewest number of turns.
 
-        Uses a priority queue to sort nodes by least number of turns required to reach it.
-        Continually updates number of turns needed to reach any given position if a better path is found.
+        Uses a priority queue to sort nodes by number of turns required to reach it plus a lower bound on the turns
+        still needed to reach self.end_pos. The search itself runs compiled in _search_minturns().
 
-        :return: self.make_path().
+        :return: tuple containing number of turns, length of route.
         """
-        # Keep track of where we've been.
-        visited = set()
-
-        # We'll keep track of the route and the number of turns to reach the curr_pos with a dict.
-        # {(position): (turns_count, (previous-position))}
-        route = {self.start_pos: None}
-
-        # turn_count is used to promote routes with fewer turns.
-        turn_count = {self.start_pos: 0}
-
-        open_pos = []
-        heappush(open_pos, (0, self.start_pos))
-
-        while open_pos:
-            # Routes with fewest turns_so_far are up first in the priority queue.
-            turns_so_far, curr_pos = heappop(open_pos)
-
-            if curr_pos in visited:
-                continue
-
-            prev = route[curr_pos]  # Always remember where you came from so we know if we've turned.
-            visited.add(curr_pos)  # But keep moving forward. Never go back!
-
-            neighbors_list = self.find_neighbors(curr_pos, prev)
-            for pos, did_turn in neighbors_list:
-                if pos in visited:
-                    continue
-
-                if turn_count.get(pos):  # Have we been here before?
-                    # If so, lets update our turn_count with the route containing the fewest turns.
-                    turn_count[pos] = min(turn_count[pos], turns_so_far + int(did_turn))
-                else:
-                    turn_count[pos] = turns_so_far + int(did_turn)
-
-                # In any case add this place to the list of places to explore.
-                heappush(open_pos, (turn_count[pos], pos))
-
-                old_route = route.get(pos)  # Do we know of another way to get here?
-                # If so, does the old_route take more turns than the current route to get to pos?
-                if old_route and turn_count[pos] < old_route[0]:
-                    # If pos can be reached in fewer turns by the current route, we overwrite the old route.
-                    route[pos] = (turn_count[pos], curr_pos)
-                if not old_route:
-                    route[pos] = (turn_count[pos], curr_pos)
-
-        # Wait until open_pos is exhausted to ensure a shorter path doesn't end our search prematurely.
-        return self.make_path(self.end_pos, route)
+        # Heap keys hold the state in 33 bits and estimated turns, at most one per state, in the 30 above it.
+        if 2 * self._size * self._size >= 1 << 30:
+            raise ValueError('MinTurns supports grids of at most 23170 x 23170.')
+        # The kernel does no bounds checking of its own.
+        if not (self._in_grid(self.start_pos) and self._in_grid(self.end_pos)):
+            return 'No path found.', []
+        (start_y, start_x), (end_y, end_x) = self.start_pos, self.end_pos
+        turns, length = _search_minturns(self._padded, start_y, start_x, end_y, end_x)
+        if turns < 0:
+            return 'No path found.', []
+        return int(turns), int(length)
 
 
 class ShortestRoute(AStar):
@@ -175,72 +238,43 @@ class ShortestRoute(AStar):
 
     """
 
-    def find_neighbors(self, curr_pos: tuple) -> list:
-        """Finds neighbors of curr_pos.
-
-        Adds coordinates of neighbors to list.
+    def __init__(self, start_pos: tuple, end_pos: tuple, grid: list):
+        """Instantiate ShortestRoute object.
 
-        :param curr_pos: curr_pos of self.search().
-        :return: list of tuples [((pos of neighbor), is_turn)].
-        """
-        limit = len(self.grid) - 1
-        neighbors = []
-        # Check each position adjacent to curr_pos
-        for y, x in zip([0, -1, 0, 1], [1, 0, -1, 0]):
-            # If adjacent position is outside of grid, skip it.
-            if (curr_pos[0] + y) > limit or (curr_pos[0] + y) < 0 or (curr_pos[1] + x) > limit or (curr_pos[1] + x) < 0:
-                continue
-            # If adjacent position is a barrier, skip it.
-            if self.grid[curr_pos[0] + y][curr_pos[1] + x] == 'x':
-                continue
-            neighbors.append((curr_pos[0] + y, curr_pos[1] + x))
-        return neighbors
-
-    def make_path(self, route: dict):
-        """Creates list of coordinates in path.
-
-        :param route: dict of coordinates leading to curr_pos.
-        :return: tuple containing list of coordinates.
+        Arguments are as for AStar. Also builds the adjacency matrix of open positions in grid and start_pos, which is
+        reused by every search.
         """
-        path = []
-        curr_pos = self.end_pos
-        while curr_pos is not None:
-            path.append(curr_pos)
-            curr_pos = route[curr_pos][1]
-        path.reverse()
-        return len(path)
+        super().__init__(start_pos, end_pos, grid)
+        n = self._size
+        is_open = self.grid_np == 0
+        # As in MinTurns, we may set out from a barrier, we just can't step onto one.
+        if self._in_grid(start_pos):
+            is_open[start_pos] = True
+        ids = np.arange(is_open.size).reshape(is_open.shape)
+        # Open positions next to each other horizontally, then vertically.
+        across = is_open[:, :-1] & is_open[:, 1:]
+        down = is_open[:-1, :] & is_open[1:, :]
+        first = np.concatenate((ids[:, :-1][across], ids[:-1, :][down]))
+        second = np.concatenate((ids[:, 1:][across], ids[1:, :][down]))
+        # Every step can be taken in either direction.
+        rows = np.concatenate((first, second))
+        cols = np.concatenate((second, first))
+        self._adjacency = csr_matrix((np.ones(rows.size), (rows, cols)), shape=(n * n, n * n))
 
     def search(self):
         """Finds shortest path through self.grid.
 
-        Uses a deque to hold coordinates of positions to explore.
-        Continually updates length to reach any given position if a shorter path to that position is found.
+        Runs scipy's Dijkstra, with every step weighted 1, over the adjacency matrix from self.start_pos.
 
-        :return: self.make_path().
+        :return: number of positions in shortest path, including start and end.
         """
-        visited = set()
-        route = {self.start_pos: (1, None)}
-        open_pos = []
-        heappush(open_pos, (1, self.start_pos))
-        while open_pos:
-            length, curr_pos = heappop(open_pos)
-            if curr_pos == self.end_pos:
-                return self.make_path(route)
-            if curr_pos in visited:
-                continue
-            visited.add(curr_pos)
-            neighbors = self.find_neighbors(curr_pos)
-            for neighbor in neighbors:
-                if neighbor in visited:
-                    continue
-                # if neighbor not in open_pos:
-                length += 1  # neighbor is one step farther than curr_pos.
-                heappush(open_pos, (length, neighbor))
-                old_route = route.get(neighbor)  # Do we know of another way to get here?
-                # If so, is it shorter than the current route to get to neighbor?
-                if old_route and length < old_route[0]:
-                    # If neighbor can be reached faster by the current route, we overwrite the old route.
-                    route[neighbor] = (length, curr_pos)
-                if not old_route:
-                    route[neighbor] = (length, curr_pos)
-        return 'No path found.', []
+        if not (self._in_grid(self.start_pos) and self._in_grid(self.end_pos)):
+            return 'No path found.', []
+        n = self._size
+        (start_y, start_x), (end_y, end_x) = self.start_pos, self.end_pos
+        start_id = start_y * n + start_x
+        end_id = end_y * n + end_x
+        dist = dijkstra(self._adjacency, indices=start_id, unweighted=True)
+        if np.isinf(dist[end_id]):
+            return 'No path found.', []
+        return int(dist[end_id]) + 1
@@ -1,26 +1,12 @@
-from random import randint
+import numpy as np
 from a_star import MinTurns, ShortestRoute
 
 
-def make_maze_line(size):
-    items = ['.', '.', '.', 'x']
-    maze_line = [items[randint(0, 3)] for _ in range(size)]
-    return ''.join(maze_line)
+def make_maze(size):
+    maze = np.random.choice(np.array(['.', 'x']), size=(size, size), p=[0.75, 0.25])
+    return [''.join(row) for row in maze]
 
 
-def make_maze(size):
-    return [make_maze_line(size) for _ in range(size)]
-
-
-maze = ['...x.....',
-        '.x.xx..x.',
-        '.x...x.x.',
-        '.xxx.x.x.',
-        '...x...x.',
-        '.x.x.x.x.',
-        '.x.....x.',
-        '..xxxxx..',
-        '.........']
 maze = make_maze(60)
 
 for line in maze:
@@ -0,0 +1,106 @@
+import random
+import unittest
+from collections import deque
+
+from a_star import MinTurns, ShortestRoute
+
+OFFSETS = ((0, 1), (-1, 0), (0, -1), (1, 0))
+
+
+def brute_force_turns(grid, start, end):
+    """Fewest turns from start to end by 0-1 BFS over (position, axis) states, None if end is unreachable."""
+    n = len(grid)
+    turns = {}
+    open_states = deque([(0, start, 0), (0, start, 1)])
+    while open_states:
+        count, pos, axis = open_states.popleft()
+        if (pos, axis) in turns:
+            continue
+        turns[(pos, axis)] = count
+        for dy, dx in OFFSETS:
+            y, x = pos[0] + dy, pos[1] + dx
+            if not (0 <= y < n and 0 <= x < n) or grid[y][x] == 'x':
+                continue
+            new_axis = 0 if dy == 0 else 1
+            if new_axis == axis:
+                open_states.appendleft((count, (y, x), new_axis))
+            else:
+                open_states.append((count + 1, (y, x), new_axis))
+    found = [turns[(end, axis)] for axis in (0, 1) if (end, axis) in turns]
+    return min(found) if found else None
+
+
+def brute_force_length(grid, start, end):
+    """Positions on the shortest route from start to end by BFS, None if end is unreachable."""
+    n = len(grid)
+    length = {start: 1}
+    open_pos = deque([start])
+    while open_pos:
+        pos = open_pos.popleft()
+        for dy, dx in OFFSETS:
+            y, x = pos[0] + dy, pos[1] + dx
+            if 0 <= y < n and 0 <= x < n and grid[y][x] != 'x' and (y, x) not in length:
+                length[(y, x)] = length[pos] + 1
+                open_pos.append((y, x))
+    return length.get(end)
+
+
+def random_maze(rng, n, start, end):
+    grid = [[rng.choice('...x') for _ in range(n)] for _ in range(n)]
+    grid[start[0]][start[1]] = grid[end[0]][end[1]] = '.'
+    return [''.join(row) for row in grid]
+
+
+class TestAStar(unittest.TestCase):
+
+    grid = ['x...',
+            '.x..',
+            '....',
+            '..x.']
+
+    def test_matches_brute_force_on_random_mazes(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            n = rng.randint(2, 15)
+            start = (rng.randrange(n), rng.randrange(n))
+            end = (rng.randrange(n), rng.randrange(n))
+            grid = random_maze(rng, n, start, end)
+            turns = brute_force_turns(grid, start, end)
+            length = brute_force_length(grid, start, end)
+            min_turns = MinTurns(start, end, grid).search()
+            shortest = ShortestRoute(start, end, grid).search()
+            if turns is None:
+                self.assertEqual(min_turns, ('No path found.', []))
+                self.assertEqual(shortest, ('No path found.', []))
+            else:
+                self.assertEqual(min_turns[0], turns)
+                self.assertGreaterEqual(min_turns[1], length)
+                self.assertEqual(shortest, length)
+
+    def test_positions_outside_grid(self):
+        for start, end in [((9, 9), (0, 0)), ((0, 0), (9, 9)), ((0, -1), (0, 3)), ((0, 0), (0, -1)), ((0, 0), (0, 4))]:
+            self.assertEqual(MinTurns(start, end, self.grid).search(), ('No path found.', []))
+            self.assertEqual(ShortestRoute(start, end, self.grid).search(), ('No path found.', []))
+
+    def test_start_on_barrier(self):
+        self.assertEqual(MinTurns((0, 0), (3, 3), self.grid).search(), (1, 7))
+        self.assertEqual(ShortestRoute((0, 0), (3, 3), self.grid).search(), 7)
+
+    def test_end_on_barrier(self):
+        self.assertEqual(MinTurns((0, 1), (1, 1), self.grid).search(), ('No path found.', []))
+        self.assertEqual(ShortestRoute((0, 1), (1, 1), self.grid).search(), ('No path found.', []))
+
+    def test_start_is_end(self):
+        self.assertEqual(MinTurns((2, 2), (2, 2), self.grid).search(), (0, 1))
+        self.assertEqual(ShortestRoute((2, 2), (2, 2), self.grid).search(), 1)
+
+    def test_non_square_grid(self):
+        for grid in (['.' * 50] * 5, ['...'] * 6, ['..', '...']):
+            with self.assertRaises(ValueError):
+                MinTurns((0, 0), (1, 1), grid)
+            with self.assertRaises(ValueError):
+                ShortestRoute((0, 0), (1, 1), grid)
+
+
+if __name__ == '__main__':
+    unittest.main()